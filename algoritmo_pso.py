@@ -3,9 +3,62 @@ Algoritmo de Optimización por Enjambre de Partículas (PSO)
 Implementación especializada para el problema de ubicación de sensores
 """
 
+import multiprocessing
 import numpy as np
 from config import PSO_CONFIG 
-from funciones_objetivo import funcion_objetivo
+from funciones_objetivo import evaluar_enjambre, precalcular_datos
+from nucleos import NUMBA_DISPONIBLE
+
+# Datos precalculados de cada proceso trabajador (se envían una sola vez)
+_precalculo_trabajador = None
+
+def _inicializar_trabajador(precalculo):
+    """
+    Guardar los datos precalculados en el proceso trabajador
+    
+    Cada trabajador usa un solo hilo de Numba para no repartir los núcleos
+    entre más hilos de los que hay.
+    
+    Args:
+        precalculo: Diccionario generado por precalcular_datos
+    """
+    global _precalculo_trabajador
+    _precalculo_trabajador = precalculo
+    
+    if NUMBA_DISPONIBLE:
+        from numba import set_num_threads
+        set_num_threads(1)
+
+def _evaluar_bloque(particulas):
+    """
+    Evaluar un bloque de partículas dentro de un proceso trabajador
+    
+    Args:
+        particulas: Arreglo (B, 2S) con un subconjunto del enjambre
+    
+    Returns:
+        ndarray: Vector (B,) con el puntaje de cada partícula
+    """
+    return evaluar_enjambre(particulas, _precalculo_trabajador)
+
+def _factor_constriccion(c1, c2):
+    """
+    Calcular el factor de constricción de Clerc y Kennedy
+    
+    chi = 2 / |2 - phi - sqrt(phi² - 4·phi)| con phi = c1 + c2; solo está
+    definido (y asegura convergencia) para phi > 4.
+    
+    Args:
+        c1: Parámetro cognitivo
+        c2: Parámetro social
+    
+    Returns:
+        float: Factor de constricción chi
+    """
+    phi = c1 + c2
+    if phi <= 4:
+        raise ValueError(f"La constricción requiere cognitivo + social > 4 (se obtuvo {phi})")
+    return 2 / abs(2 - phi - np.sqrt(phi * phi - 4 * phi))
 
 class PSOOptimizer:
     """
@@ -13,16 +66,20 @@ class PSOOptimizer:
     
     Atributos:
         datos: DataFrame con los puntos de muestreo
+        precalculo: Arreglos invariantes de los datos para la función objetivo
         n_sensores: Número de sensores a ubicar
         n_particulas: Tamaño del enjambre
         max_iter: Número máximo de iteraciones
-        particulas: Posiciones actuales del enjambre
-        velocidades: Velocidades actuales del enjambre
+        rng: Generador de números aleatorios del enjambre
+        pool: Procesos trabajadores para evaluar el enjambre (None si es secuencial)
+        particulas: Arreglo (P, 2S) con las posiciones actuales del enjambre
+        velocidades: Arreglo (P, 2S) con las velocidades actuales del enjambre
         mejores_locales: Mejores posiciones individuales
         mejor_global: Mejor posición global encontrada
     """
     
-    def __init__(self, datos, n_sensores=5, n_particulas=30, max_iter=100):
+    def __init__(self, datos, n_sensores=5, n_particulas=30, max_iter=100, semilla=None,
+                 n_procesos=1, asincrono=False):
         """
         Inicializar el optimizador PSO
         
@@ -31,28 +88,89 @@ class PSOOptimizer:
             n_sensores: Número de sensores a optimizar
             n_particulas: Tamaño del enjambre de partículas
             max_iter: Número máximo de iteraciones
+            semilla: Semilla del generador aleatorio (None para no reproducible)
+            n_procesos: Número de procesos para evaluar el enjambre en paralelo; solo
+                        compensa con enjambres o conjuntos de datos grandes, ya
+                        que enviar cada bloque cuesta más que evaluarlo. Se
+                        liberan al terminar optimizar(), con cerrar() o al salir
+                        de un bloque with
+            asincrono: Actualizar el mejor global después de cada partícula
+                       (las partículas se evalúan una a una y no usan los procesos)
         """
         self.datos = datos
         self.n_sensores = n_sensores
         self.n_particulas = n_particulas
         self.max_iter = max_iter
+        self.asincrono = asincrono
+        
+        # Generador aleatorio propio del optimizador
+        self.rng = np.random.default_rng(semilla)
+        
+        # Precalcular coordenadas, filtros por cultivo y zonas críticas
+        self.precalculo = precalcular_datos(datos)
         
         # Establecer límites del espacio de búsqueda
         self.lat_min, self.lat_max = datos['Latitud'].min(), datos['Latitud'].max()
         self.lon_min, self.lon_max = datos['Longitud'].min(), datos['Longitud'].max()
         
+        # Límites por dimensión con formato [lat1, lon1, lat2, lon2, ...]
+        self.limite_inferior = np.tile([self.lat_min, self.lon_min], n_sensores)
+        self.limite_superior = np.tile([self.lat_max, self.lon_max], n_sensores)
+        
         # Cargar parámetros PSO desde configuración
-        self.w = PSO_CONFIG['inercia']
+        self.w_inicial = PSO_CONFIG['inercia_inicial']
+        self.w_final = PSO_CONFIG['inercia_final']
+        self.w = self.w_inicial
         self.c1 = PSO_CONFIG['cognitivo']
         self.c2 = PSO_CONFIG['social']
-        self.vel_max = PSO_CONFIG['velocidad_maxima']
+        self.chi = _factor_constriccion(self.c1, self.c2)
+        
+        # Sin más procesos que partículas, para que ningún bloque quede vacío
+        self.n_procesos = min(n_procesos, n_particulas)
+        self.pool = None
+        
+        # Crear los procesos una sola vez, fuera del ciclo de iteraciones.
+        # Se usa 'spawn' porque fork no es seguro con los hilos de Numba.
+        # El modo asíncrono evalúa partícula por partícula y no los usa
+        if self.n_procesos > 1 and not asincrono:
+            contexto = multiprocessing.get_context('spawn')
+            self.pool = contexto.Pool(self.n_procesos, initializer=_inicializar_trabajador,
+                                      initargs=(self.precalculo,))
         
-        # Inicializar estado del algoritmo
-        self._inicializar_enjambre()
+        # Inicializar estado del algoritmo; no dejar procesos vivos si falla
+        try:
+            self._inicializar_enjambre()
+        except BaseException:
+            self.cerrar()
+            raise
         
         # Historial para análisis de convergencia
         self.historial_puntajes = []
     
+    def cerrar(self):
+        """
+        Liberar los procesos trabajadores; las evaluaciones posteriores son secuenciales
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+    
+    def __enter__(self):
+        """
+        Usar el optimizador como gestor de contexto
+        
+        Returns:
+            PSOOptimizer: El propio optimizador
+        """
+        return self
+    
+    def __exit__(self, *exc):
+        """
+        Liberar los procesos trabajadores al salir del bloque with
+        """
+        self.cerrar()
+    
     def _inicializar_enjambre(self):
         """
         Inicializar las posiciones y velocidades del enjambre
@@ -60,163 +178,160 @@ class PSOOptimizer:
         Cada partícula representa una posible configuración de sensores
         Formato: [lat1, lon1, lat2, lon2, ..., latN, lonN]
         """
+        dimensiones = (self.n_particulas, self.n_sensores * 2)
+        
         # Inicializar posiciones aleatorias dentro de los límites
-        self.particulas = self._inicializar_particulas()
-        self.velocidades = self._inicializar_velocidades()
+        self.particulas = self.rng.uniform(self.limite_inferior, self.limite_superior, dimensiones)
+        
+        # Velocidades iniciales pequeñas para exploración gradual
+        self.velocidades = self.rng.uniform(-0.001, 0.001, dimensiones)
         
         # Inicializar mejores posiciones individuales
         self.mejores_locales = self.particulas.copy()
-        self.mejores_puntajes_locales = [self._evaluar_particula(p) for p in self.particulas]
+        self.mejores_puntajes_locales = self._evaluar_enjambre()
         
         # Encontrar mejor posición global inicial
         mejor_idx = np.argmax(self.mejores_puntajes_locales)
         self.mejor_global = self.particulas[mejor_idx].copy()
         self.mejor_puntaje_global = self.mejores_puntajes_locales[mejor_idx]
     
-    def _inicializar_particulas(self):
+    def _evaluar_enjambre(self):
         """
-        Crear partículas con posiciones aleatorias dentro del espacio de búsqueda
+        Evaluar todas las partículas del enjambre usando la función objetivo
         
-        Returns:
-            list: Lista de arrays numpy representando las partículas
-        """
-        particulas = []
-        for _ in range(self.n_particulas):
-            particula = []
-            for _ in range(self.n_sensores):
-                # Generar coordenadas aleatorias dentro de los límites geográficos
-                lat = np.random.uniform(self.lat_min, self.lat_max)
-                lon = np.random.uniform(self.lon_min, self.lon_max)
-                particula.extend([lat, lon])
-            particulas.append(np.array(particula))
-        return particulas
-    
-    def _inicializar_velocidades(self):
-        """
-        Inicializar velocidades con valores pequeños aleatorios
+        Con varios procesos el enjambre se divide en un bloque por proceso.
         
         Returns:
-            list: Lista de arrays numpy representando las velocidades
-        """
-        velocidades = []
-        for _ in range(self.n_particulas):
-            # Velocidades iniciales pequeñas para exploración gradual
-            velocidad = np.random.uniform(-0.001, 0.001, self.n_sensores * 2)
-            velocidades.append(velocidad)
-        return velocidades
-    
-    def _formatear_sensores(self, particula):
+            ndarray: Vector con el puntaje de cada partícula
         """
-        Convertir representación de partícula a lista de sensores
-        
-        Args:
-            particula: Array numpy con formato [lat1, lon1, lat2, lon2, ...]
+        if self.pool is None:
+            return evaluar_enjambre(self.particulas, self.precalculo)
         
-        Returns:
-            list: Lista de sensores [[lat, lon], ...]
-        """
-        return [particula[i:i+2].tolist() for i in range(0, len(particula), 2)]
-    
-    def _evaluar_particula(self, particula):
-        """
-        Evaluar una partícula usando la función objetivo
-        
-        Args:
-            particula: Array numpy representando una configuración de sensores
-        
-        Returns:
-            float: Puntaje de la configuración según función objetivo
-        """
-        sensores = self._formatear_sensores(particula)
-        return funcion_objetivo(sensores, self.datos)
+        bloques = np.array_split(self.particulas, self.n_procesos)
+        return np.concatenate(self.pool.map(_evaluar_bloque, bloques))
     
     def optimizar(self):
         """
         Ejecutar el algoritmo PSO para encontrar configuración óptima
         
         Returns:
-            tuple: (mejores_sensores, mejor_puntaje) - Configuración óptima encontrada
+            tuple: (mejores_sensores, mejor_puntaje) - Configuración óptima encontrada,
+                   con los sensores como arreglo (S, 2) [[lat, lon], ...]
         """
         print(f"Iniciando PSO - {self.n_particulas} particulas, {self.max_iter} iteraciones")
         
-        for iteracion in range(self.max_iter):
-            # Evaluar y actualizar mejores posiciones
-            self._actualizar_mejores_posiciones()
-            
-            # Mover partículas según ecuaciones de PSO
-            self._actualizar_velocidades_posiciones()
-            
-            # Registrar progreso
-            self.historial_puntajes.append(self.mejor_puntaje_global)
-            
-            # Mostrar progreso cada 10 iteraciones
-            if (iteracion + 1) % 10 == 0:
-                print(f"Iteracion {iteracion + 1}: Mejor puntaje = {self.mejor_puntaje_global:.4f}")
+        try:
+            for iteracion in range(self.max_iter):
+                # Peso de inercia decreciente: explorar al inicio, explotar al final;
+                # llega a inercia_final exactamente en la última iteración
+                self.w = (self.w_inicial - (self.w_inicial - self.w_final)
+                          * iteracion / max(self.max_iter - 1, 1))
+                
+                if self.asincrono:
+                    # Evaluar y mover cada partícula con el mejor global más reciente
+                    self._iterar_asincrono()
+                else:
+                    # Evaluar y actualizar mejores posiciones
+                    self._actualizar_mejores_posiciones()
+                    
+                    # Mover partículas según ecuaciones de PSO
+                    self._actualizar_velocidades_posiciones()
+                
+                # Registrar progreso
+                self.historial_puntajes.append(self.mejor_puntaje_global)
+                
+                # Mostrar progreso cada 10 iteraciones
+                if (iteracion + 1) % 10 == 0:
+                    print(f"Iteracion {iteracion + 1}: Mejor puntaje = {self.mejor_puntaje_global:.4f}")
+        finally:
+            self.cerrar()
         
         print("Optimizacion completada")
         print(f"Mejor puntaje encontrado: {self.mejor_puntaje_global:.4f}")
         
-        return self._formatear_sensores(self.mejor_global), self.mejor_puntaje_global
+        return self.mejor_global.reshape(-1, 2).copy(), self.mejor_puntaje_global
     
     def _actualizar_mejores_posiciones(self):
         """
         Actualizar mejores posiciones locales y globales
         """
+        # Evaluar todo el enjambre en una sola pasada
+        puntajes = self._evaluar_enjambre()
+        
+        # Actualizar mejores locales de las partículas que mejoraron, en el lugar
+        mejoras = puntajes > self.mejores_puntajes_locales
+        self.mejores_puntajes_locales[mejoras] = puntajes[mejoras]
+        self.mejores_locales[mejoras] = self.particulas[mejoras]
+        
+        # Actualizar mejor global si se encontró mejora
+        mejor_idx = np.argmax(puntajes)
+        if puntajes[mejor_idx] > self.mejor_puntaje_global:
+            self.mejor_puntaje_global = puntajes[mejor_idx]
+            np.copyto(self.mejor_global, self.particulas[mejor_idx])
+    
+    def _iterar_asincrono(self):
+        """
+        Ejecutar una iteración asíncrona del enjambre
+        
+        Cada partícula se evalúa, actualiza su mejor local y el mejor global,
+        y se mueve de inmediato, de modo que la siguiente partícula ya puede
+        aprovechar una mejora encontrada dentro de la misma iteración.
+        """
         for i in range(self.n_particulas):
-            # Evaluar partícula actual
-            puntaje_actual = self._evaluar_particula(self.particulas[i])
+            puntaje_actual = evaluar_enjambre(self.particulas[i:i+1], self.precalculo)[0]
             
             # Actualizar mejor local si se encontró mejora
             if puntaje_actual > self.mejores_puntajes_locales[i]:
                 self.mejores_puntajes_locales[i] = puntaje_actual
-                self.mejores_locales[i] = self.particulas[i].copy()
+                self.mejores_locales[i] = self.particulas[i]
             
             # Actualizar mejor global si se encontró mejora
             if puntaje_actual > self.mejor_puntaje_global:
                 self.mejor_puntaje_global = puntaje_actual
-                self.mejor_global = self.particulas[i].copy()
+                np.copyto(self.mejor_global, self.particulas[i])
+            
+            # Mover la partícula con el mejor global actualizado
+            self._actualizar_velocidades_posiciones(slice(i, i + 1))
     
-    def _actualizar_velocidades_posiciones(self):
+    def _actualizar_velocidades_posiciones(self, filas=slice(None)):
         """
         Actualizar velocidades y posiciones según ecuaciones de PSO
+        
+        Usa el factor de constricción de Clerc y Kennedy, calculado a partir de
+        c1 + c2 > 4, que asegura la convergencia sin necesidad de limitar la
+        velocidad máxima, con un peso de inercia que decrece linealmente a lo
+        largo de las iteraciones. El peso va dentro del corchete, por lo que la
+        inercia efectiva es chi*w (variante híbrida, no TVIW puro). Todo el
+        enjambre se actualiza de una vez con operaciones sobre arreglos.
+        
+        Args:
+            filas: Partículas a actualizar (por defecto todo el enjambre)
         """
-        for i in range(self.n_particulas):
-            # Generar factores aleatorios para estocasticidad
-            r1, r2 = np.random.random(2)
-            
-            # Calcular componentes de velocidad
-            inercia = self.w * self.velocidades[i]
-            cognitivo = self.c1 * r1 * (self.mejores_locales[i] - self.particulas[i])
-            social = self.c2 * r2 * (self.mejor_global - self.particulas[i])
-            
-            # Actualizar velocidad total
-            self.velocidades[i] = inercia + cognitivo + social
-            
-            # Limitar velocidad máxima para estabilidad
-            self.velocidades[i] = np.clip(self.velocidades[i], -self.vel_max, self.vel_max)
-            
-            # Actualizar posición
-            self.particulas[i] += self.velocidades[i]
-            
-            # Aplicar restricciones de límites geográficos
-            self._aplicar_restricciones(i)
+        particulas = self.particulas[filas]
+        
+        # Generar factores aleatorios para estocasticidad (uno por dimensión)
+        r1 = self.rng.random(particulas.shape)
+        r2 = self.rng.random(particulas.shape)
+        
+        # Actualizar velocidad con componentes de inercia, cognitivo y social
+        self.velocidades[filas] = self.chi * (self.w * self.velocidades[filas] + 
+                                              self.c1 * r1 * (self.mejores_locales[filas] - particulas) + 
+                                              self.c2 * r2 * (self.mejor_global - particulas))
+        
+        # Actualizar posición
+        particulas += self.velocidades[filas]
+        
+        # Aplicar restricciones de límites geográficos
+        self._aplicar_restricciones(particulas)
     
-    def _aplicar_restricciones(self, indice_particula):
+    def _aplicar_restricciones(self, particulas):
         """
         Asegurar que las partículas se mantengan dentro de los límites geográficos
         
         Args:
-            indice_particula: Índice de la partícula a restringir
-        """
-        for j in range(0, len(self.particulas[indice_particula]), 2):
-            # Restringir latitud
-            self.particulas[indice_particula][j] = np.clip(
-                self.particulas[indice_particula][j], self.lat_min, self.lat_max
-            )
-            # Restringir longitud
-            self.particulas[indice_particula][j+1] = np.clip(
-                self.particulas[indice_particula][j+1], self.lon_min, self.lon_max
-            )
+            particulas: Vista (B, 2S) del enjambre a restringir en el lugar
+        """
+        np.clip(particulas, self.limite_inferior, self.limite_superior, out=particulas)
     
     def visualizar_convergencia(self):
         """
@@ -7,6 +7,7 @@ Parámetros y constantes utilizadas en todo el sistema
 CONFIG = {
     'radio_cobertura': 0.012,      # Radio de cobertura básica de sensores (grados)
     'radio_influencia': 0.018,     # Radio de influencia para balance de cultivos
+    'radio_critico': 0.010,        # Radio más estricto para cubrir zonas críticas
     'distancia_ideal': 0.025,      # Distancia ideal entre sensores para optimizar distribución
     'pesos': {
         'cobertura': 0.35,         # Peso para cobertura espacial
@@ -22,9 +23,13 @@ CONFIG = {
 }
 
 # Parámetros del algoritmo PSO
+# Variante híbrida: w decrece linealmente dentro del corchete de la constricción,
+# v = chi * (w*v + c1*r1*(pbest - x) + c2*r2*(gbest - x)), así que la inercia
+# efectiva es chi*w (de 0.66 a 0.29), no la de un esquema TVIW puro
 PSO_CONFIG = {
-    'inercia': 0.7,           # Parámetro de inercia (w)
-    'cognitivo': 1.5,         # Parámetro cognitivo (c1)
-    'social': 1.5,            # Parámetro social (c2)
-    'velocidad_maxima': 0.005 # Límite de velocidad de partículas
+    'inercia_inicial': 0.9,   # Peso de inercia (w) al inicio de la búsqueda
+    'inercia_final': 0.4,     # Peso de inercia (w) en la última iteración
+    'cognitivo': 2.05,        # Parámetro cognitivo (c1)
+    'social': 2.05            # Parámetro social (c2); c1 + c2 > 4 para la constricción
+                              # de Clerc y Kennedy (chi = 0.7298 con c1 + c2 = 4.1)
 }
\ No newline at end of file
@@ -5,35 +5,39 @@ Estrategias manuales para comparación con el algoritmo PSO
 
 import numpy as np
 import pandas as pd
+from funciones_objetivo import identificar_zonas_criticas, obtener_coordenadas
 
-def configuracion_aleatoria(n_sensores=5, datos=None):
+def configuracion_aleatoria(n_sensores=5, datos=None, rng=None):
     """
     Generar configuración aleatoria de sensores
     
     Args:
         n_sensores: Número de sensores
         datos: DataFrame con datos para determinar límites
+        rng: Generador aleatorio numpy (opcional)
     
     Returns:
-        list: Lista de sensores [[lat, lon], ...]
+        ndarray: Arreglo (S, 2) de sensores [[lat, lon], ...]
     """
+    rng = np.random.default_rng() if rng is None else rng
     lat_min, lat_max = datos['Latitud'].min(), datos['Latitud'].max()
     lon_min, lon_max = datos['Longitud'].min(), datos['Longitud'].max()
     
-    return [[np.random.uniform(lat_min, lat_max), 
-             np.random.uniform(lon_min, lon_max)] for _ in range(n_sensores)]
+    return rng.uniform([lat_min, lon_min], [lat_max, lon_max], (n_sensores, 2))
 
-def configuracion_centros_cultivo(n_sensores=5, datos=None):
+def configuracion_centros_cultivo(n_sensores=5, datos=None, rng=None):
     """
     Ubicar sensores en centros de masa de cada tipo de cultivo
     
     Args:
         n_sensores: Número de sensores
         datos: DataFrame con datos de cultivos
+        rng: Generador aleatorio numpy (opcional)
     
     Returns:
-        list: Lista de sensores [[lat, lon], ...]
+        ndarray: Arreglo (S, 2) de sensores [[lat, lon], ...]
     """
+    rng = np.random.default_rng() if rng is None else rng
     centros = {}
     for cultivo in ['Maíz', 'Tomate', 'Chile']:
         cultivo_data = datos[datos['Cultivo'] == cultivo]
@@ -44,44 +48,33 @@ def configuracion_centros_cultivo(n_sensores=5, datos=None):
     
     # Completar con variaciones alrededor de centros si se necesitan más sensores
     while len(sensores) < n_sensores:
-        cultivo = np.random.choice(['Maíz', 'Tomate', 'Chile'])
-        variacion_lat = np.random.uniform(-0.005, 0.005)
-        variacion_lon = np.random.uniform(-0.005, 0.005)
+        cultivo = rng.choice(['Maíz', 'Tomate', 'Chile'])
+        variacion_lat, variacion_lon = rng.uniform(-0.005, 0.005, 2)
         sensores.append([centros[cultivo][0] + variacion_lat,
                         centros[cultivo][1] + variacion_lon])
     
-    return sensores
+    return np.array(sensores)
 
-def configuracion_zonas_criticas(n_sensores=5, datos=None):
+def configuracion_zonas_criticas(n_sensores=5, datos=None, rng=None):
     """
     Ubicar sensores en zonas con problemas identificados
     
     Args:
         n_sensores: Número de sensores
         datos: DataFrame con datos de cultivos
+        rng: Generador aleatorio numpy para completar sensores (opcional)
     
     Returns:
-        list: Lista de sensores [[lat, lon], ...]
+        ndarray: Arreglo (S, 2) de sensores [[lat, lon], ...]
     """
     # Identificar zonas críticas
-    zonas_criticas = datos[
-        (datos['Salinidad'] > 2.5) | 
-        (datos['Humedad'] < 15) | 
-        (datos['Humedad'] > 40)
-    ]
+    zonas_criticas = datos[identificar_zonas_criticas(datos)]
     
-    sensores = []
     if len(zonas_criticas) >= n_sensores:
         # Tomar los puntos más críticos (mayor salinidad)
-        indices_criticos = zonas_criticas.nlargest(n_sensores, 'Salinidad').index
-        for idx in indices_criticos:
-            sensores.append([datos.loc[idx, 'Latitud'], datos.loc[idx, 'Longitud']])
-    else:
-        # Usar todas las zonas críticas disponibles
-        for idx in zonas_criticas.index:
-            sensores.append([datos.loc[idx, 'Latitud'], datos.loc[idx, 'Longitud']])
-        # Completar con sensores aleatorios
-        while len(sensores) < n_sensores:
-            sensores.extend(configuracion_aleatoria(n_sensores - len(sensores), datos))
+        return obtener_coordenadas(zonas_criticas.nlargest(n_sensores, 'Salinidad'))
     
-    return sensores
\ No newline at end of file
+    # Usar todas las zonas críticas disponibles y completar con sensores aleatorios
+    sensores = obtener_coordenadas(zonas_criticas)
+    faltantes = configuracion_aleatoria(n_sensores - len(sensores), datos, rng)
+    return np.vstack([sensores, faltantes])
\ No newline at end of file
@@ -5,7 +5,13 @@ Incluye componentes de cobertura, balance de cultivos y optimización espacial
 
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
+from scipy.spatial.distance import pdist
 from config import CONFIG
+from nucleos import NUMBA_DISPONIBLE
+
+if NUMBA_DISPONIBLE:
+    from nucleos import puntuar_enjambre
 
 def calcular_distancia(punto1, punto2):
     """
@@ -20,6 +26,115 @@ def calcular_distancia(punto1, punto2):
     """
     return np.sqrt((punto1[0] - punto2[0])**2 + (punto1[1] - punto2[1])**2)
 
+def puntos_cubiertos(ubicaciones_sensores, coords, radio):
+    """
+    Determinar qué puntos tienen al menos un sensor dentro del radio
+    
+    Construye un árbol KD sobre los sensores y consulta el vecino más cercano
+    de todos los puntos en una sola llamada, limitada al radio indicado.
+    
+    Args:
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
+        coords: Arreglo (N, 2) de puntos a evaluar
+        radio: Radio máximo de cobertura (inclusive)
+    
+    Returns:
+        ndarray: Máscara booleana (N,) de puntos cubiertos
+    """
+    if len(coords) == 0:
+        return np.zeros(0, dtype=bool)
+    
+    arbol = cKDTree(np.asarray(ubicaciones_sensores, dtype=float))
+    # El límite de la consulta es estricto; se amplía un ulp para incluir el radio
+    dist, _ = arbol.query(coords, k=1, distance_upper_bound=np.nextafter(radio, np.inf))
+    return np.isfinite(dist)
+
+def obtener_coordenadas(datos):
+    """
+    Extraer las coordenadas de los puntos de muestreo como arreglo numpy
+    
+    Args:
+        datos: DataFrame con puntos de muestreo o arreglo (N, 2) ya extraído
+    
+    Returns:
+        ndarray: Arreglo (N, 2) con columnas [latitud, longitud]
+    """
+    if isinstance(datos, pd.DataFrame):
+        return datos[['Latitud', 'Longitud']].to_numpy()
+    return np.asarray(datos)
+
+def identificar_zonas_criticas(datos):
+    """
+    Identificar zonas críticas basadas en condiciones del suelo
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+    
+    Returns:
+        Series: Máscara booleana con los puntos que requieren monitoreo intensivo
+    """
+    return ((datos['Salinidad'] > 2.5) |   # Alta salinidad
+            (datos['Humedad'] < 15) |      # Muy secas
+            (datos['Humedad'] > 40))       # Muy húmedas
+
+def precalcular_datos(datos):
+    """
+    Precalcular los arreglos invariantes que necesita evaluar_enjambre
+    
+    Los datos no cambian durante la optimización, por lo que los filtros por
+    cultivo y por zona crítica se resuelven una sola vez.
+    
+    Las coordenadas se guardan en float32 relativas a la esquina mínima del
+    área ('origen'): las diferencias son de décimas de grado, muy dentro de
+    la precisión de float32, y se reduce a la mitad la memoria recorrida.
+    Los puntos se ordenan por cultivo, de modo que cada cultivo ocupa un
+    segmento contiguo delimitado por 'limites_cultivo'.
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+    
+    Returns:
+        dict: Coordenadas generales, por cultivo y de zonas críticas
+    """
+    coords = obtener_coordenadas(datos)
+    origen = coords.min(axis=0)
+    
+    def _relativas(coords_puntos):
+        return np.ascontiguousarray(coords_puntos - origen, dtype=np.float32)
+    
+    # Índice de cultivo de cada punto; los cultivos no evaluados van al final
+    nombres_cultivos = ['Maíz', 'Tomate', 'Chile']
+    cultivos = datos['Cultivo'].to_numpy()
+    indice_cultivo = np.full(len(datos), len(nombres_cultivos))
+    for indice, cultivo in enumerate(nombres_cultivos):
+        indice_cultivo[cultivos == cultivo] = indice
+    
+    # Ordenar los puntos por cultivo y ubicar el inicio de cada segmento
+    orden = np.argsort(indice_cultivo, kind='stable')
+    coords_ordenadas = _relativas(coords[orden])
+    limites_cultivo = np.append(
+        np.searchsorted(indice_cultivo[orden], np.arange(len(nombres_cultivos) + 1)), len(datos))
+    
+    coords_cultivo = {cultivo: coords_ordenadas[limites_cultivo[indice]:limites_cultivo[indice + 1]]
+                      for indice, cultivo in enumerate(nombres_cultivos)}
+    conteo_cultivos = np.diff(limites_cultivo[:len(nombres_cultivos) + 1]).astype(float)
+    
+    pesos = CONFIG['pesos']
+    return {
+        'origen': origen,
+        'coords': coords_ordenadas,
+        'coords_cultivo': coords_cultivo,
+        'coords_criticas': _relativas(coords[identificar_zonas_criticas(datos).to_numpy()]),
+        'conteo_cultivos': conteo_cultivos,
+        'proporcion_cultivos': conteo_cultivos / len(datos),
+        # Representación plana para el núcleo compilado
+        'limites_cultivo': limites_cultivo,
+        'parametros': np.array([CONFIG['radio_cobertura'], CONFIG['radio_influencia'],
+                                CONFIG['radio_critico'], CONFIG['distancia_ideal']]),
+        'pesos': np.array([pesos['cobertura'], pesos['balance_cultivos'],
+                           pesos['zonas_criticas'], pesos['distribucion']])
+    }
+
 def calcular_cobertura_variabilidad(ubicaciones_sensores, datos):
     """
     Evaluar cobertura espacial de los sensores
@@ -28,30 +143,42 @@ def calcular_cobertura_variabilidad(ubicaciones_sensores, datos):
     considerando un radio de cobertura específico.
     
     Args:
-        ubicaciones_sensores: Lista de sensores [[lat, lon], ...]
-        datos: DataFrame con puntos de muestreo
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
+        datos: DataFrame con puntos de muestreo o arreglo (N, 2) de coordenadas
     
     Returns:
         float: Puntaje de cobertura normalizado [0,1]
     """
-    puntaje = 0
-    total_puntos = len(datos)
+    coords = obtener_coordenadas(datos)
+    sensores = np.asarray(ubicaciones_sensores, dtype=float)
+    
+    # Matriz (N, S) de distancias al cuadrado y mínimo por punto
+    distancias2 = ((coords[:, None, :] - sensores[None, :, :])**2).sum(-1)
+    dist2_minima = distancias2.min(axis=1)
+    
+    return _puntaje_cobertura(dist2_minima)
+
+def _puntaje_cobertura(dist2_minima):
+    """
+    Puntaje de cobertura a partir de la distancia al sensor más cercano
+    
+    Args:
+        dist2_minima: Arreglo (..., N) con la distancia mínima al cuadrado de cada punto
+    
+    Returns:
+        ndarray: Puntaje promediado sobre el último eje
+    """
     radio = CONFIG['radio_cobertura']
     
-    for _, punto in datos.iterrows():
-        punto_coords = [punto['Latitud'], punto['Longitud']]
-        # Calcular distancia al sensor más cercano
-        distancias = [calcular_distancia(punto_coords, sensor) for sensor in ubicaciones_sensores]
-        dist_minima = min(distancias)
-        
-        # Puntaje completo si está dentro del radio, reducido si está fuera
-        if dist_minima <= radio:
-            puntaje += 1
-        else:
-            # Puntaje decreciente con la distancia
-            puntaje += max(0, 1 - (dist_minima - radio) / (2 * radio))
+    # Puntaje completo si está dentro del radio
+    puntajes = np.ones_like(dist2_minima)
     
-    return puntaje / total_puntos
+    # Puntaje decreciente con la distancia; la raíz solo se toma fuera del radio
+    fuera = dist2_minima > radio * radio
+    dist_fuera = np.sqrt(dist2_minima[fuera])
+    puntajes[fuera] = np.maximum(0, 1 - (dist_fuera - radio) / (2 * radio))
+    
+    return puntajes.mean(axis=-1)
 
 def balance_entre_cultivos(ubicaciones_sensores, datos):
     """
@@ -61,38 +188,40 @@ def balance_entre_cultivos(ubicaciones_sensores, datos):
     a su presencia en el área de estudio.
     
     Args:
-        ubicaciones_sensores: Lista de sensores [[lat, lon], ...]
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
         datos: DataFrame con puntos de muestreo
     
     Returns:
         float: Puntaje de balance normalizado [0,1]
     """
-    conteo_total = datos['Cultivo'].value_counts()
-    conteo_cubierto = {'Maíz': 0, 'Tomate': 0, 'Chile': 0}
-    radio = CONFIG['radio_influencia']
+    nombres_cultivos = ['Maíz', 'Tomate', 'Chile']
+    conteo_total = datos['Cultivo'].value_counts()[nombres_cultivos].to_numpy()
     
     # Contar puntos cubiertos por cultivo
-    for cultivo in conteo_cubierto.keys():
-        puntos_cultivo = datos[datos['Cultivo'] == cultivo]
-        
-        for _, punto in puntos_cultivo.iterrows():
-            punto_coords = [punto['Latitud'], punto['Longitud']]
-            cubierto = any(calcular_distancia(punto_coords, sensor) <= radio 
-                          for sensor in ubicaciones_sensores)
-            
-            if cubierto:
-                conteo_cubierto[cultivo] += 1
-    
-    # Calcular puntaje de balance
-    puntaje_balance = 0
-    for cultivo in conteo_cubierto:
-        proporcion_ideal = conteo_total[cultivo] / len(datos)
-        cobertura_real = conteo_cubierto[cultivo] / conteo_total[cultivo]
-        diferencia = abs(proporcion_ideal - cobertura_real)
-        puntaje_cultivo = 1 - diferencia
-        puntaje_balance += min(puntaje_cultivo, 1.0)  # Limitar a máximo 1.0
-    
-    return puntaje_balance / len(conteo_cubierto)
+    cubiertos = puntos_cubiertos(ubicaciones_sensores, obtener_coordenadas(datos),
+                                 CONFIG['radio_influencia'])
+    cultivos = datos['Cultivo'].to_numpy()
+    conteo_cubierto = np.array([cubiertos[cultivos == cultivo].sum() for cultivo in nombres_cultivos])
+    
+    return _puntaje_balance(conteo_cubierto, conteo_total, conteo_total / len(datos))
+
+def _puntaje_balance(conteo_cubierto, conteo_total, proporcion_ideal):
+    """
+    Puntaje de balance a partir de los puntos cubiertos de cada cultivo
+    
+    Args:
+        conteo_cubierto: Arreglo (..., C) con los puntos cubiertos por cultivo
+        conteo_total: Arreglo (C,) con los puntos totales por cultivo
+        proporcion_ideal: Arreglo (C,) con la fracción de puntos de cada cultivo
+    
+    Returns:
+        ndarray: Puntaje promediado sobre los cultivos (último eje)
+    """
+    cobertura_real = conteo_cubierto / conteo_total
+    diferencia = np.abs(proporcion_ideal - cobertura_real)
+    puntaje_cultivo = np.minimum(1 - diferencia, 1.0)  # Limitar a máximo 1.0
+    
+    return puntaje_cultivo.mean(axis=-1)
 
 def cubrir_zonas_problematicas(ubicaciones_sensores, datos):
     """
@@ -102,33 +231,21 @@ def cubrir_zonas_problematicas(ubicaciones_sensores, datos):
     que requieren monitoreo más intensivo.
     
     Args:
-        ubicaciones_sensores: Lista de sensores [[lat, lon], ...]
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
         datos: DataFrame con puntos de muestreo
     
     Returns:
         float: Puntaje de cobertura de zonas críticas [0,1]
     """
-    # Identificar zonas críticas basadas en condiciones del suelo
-    zonas_criticas = datos[
-        (datos['Salinidad'] > 2.5) |   # Alta salinidad
-        (datos['Humedad'] < 15) |      # Muy secas
-        (datos['Humedad'] > 40)        # Muy húmedas
-    ]
+    zonas_criticas = datos[identificar_zonas_criticas(datos)]
     
     if len(zonas_criticas) == 0:
         return 1.0  # Si no hay zonas críticas, puntaje perfecto
     
-    puntos_cubiertos = 0
-    radio_critico = 0.01  # Radio más estricto para zonas críticas
+    cubiertos = puntos_cubiertos(ubicaciones_sensores, obtener_coordenadas(zonas_criticas),
+                                 CONFIG['radio_critico'])
     
-    for _, punto_critico in zonas_criticas.iterrows():
-        punto_coords = [punto_critico['Latitud'], punto_critico['Longitud']]
-        cubierto = any(calcular_distancia(punto_coords, sensor) <= radio_critico 
-                      for sensor in ubicaciones_sensores)
-        if cubierto:
-            puntos_cubiertos += 1
-    
-    return puntos_cubiertos / len(zonas_criticas)
+    return cubiertos.sum() / len(zonas_criticas)
 
 def optimizar_distancias(ubicaciones_sensores):
     """
@@ -138,7 +255,7 @@ def optimizar_distancias(ubicaciones_sensores):
     evitando aglomeraciones y áreas sin cobertura.
     
     Args:
-        ubicaciones_sensores: Lista de sensores [[lat, lon], ...]
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
     
     Returns:
         float: Puntaje de distribución normalizado [0,1]
@@ -147,25 +264,50 @@ def optimizar_distancias(ubicaciones_sensores):
         return 1.0
     
     # Calcular todas las distancias entre pares de sensores
-    distancias = []
-    for i in range(len(ubicaciones_sensores)):
-        for j in range(i + 1, len(ubicaciones_sensores)):
-            dist = calcular_distancia(ubicaciones_sensores[i], ubicaciones_sensores[j])
-            distancias.append(dist)
+    distancias = pdist(np.asarray(ubicaciones_sensores, dtype=float))
+    
+    return _puntaje_dispersion(distancias)
+
+def _puntaje_dispersion(distancias):
+    """
+    Puntaje de distribución a partir de las distancias entre pares de sensores
     
+    Args:
+        distancias: Arreglo (..., K) con las distancias de cada par
+    
+    Returns:
+        ndarray: Puntaje promediado sobre el último eje
+    """
     dist_ideal = CONFIG['distancia_ideal']
-    puntaje_dispersion = 0
     
-    # Evaluar cada distancia contra la distancia ideal
-    for dist in distancias:
-        if dist >= dist_ideal * 0.7 and dist <= dist_ideal * 1.3:
-            # Distancia cercana al ideal - puntaje completo
-            puntaje_dispersion += 1
-        else:
-            # Puntaje reducido proporcionalmente a la desviación
-            puntaje_dispersion += max(0, 1 - abs(dist - dist_ideal) / dist_ideal)
+    # Puntaje completo si la distancia es cercana al ideal, reducido
+    # proporcionalmente a la desviación en caso contrario
+    cercanas = (distancias >= dist_ideal * 0.7) & (distancias <= dist_ideal * 1.3)
+    puntajes = np.where(cercanas, 1.0,
+                        np.maximum(0, 1 - np.abs(distancias - dist_ideal) / dist_ideal))
     
-    return puntaje_dispersion / len(distancias)
+    return puntajes.mean(axis=-1)
+
+def combinar_componentes(puntaje_cobertura, puntaje_cultivos, puntaje_criticas, puntaje_distribucion):
+    """
+    Combinar los componentes de la función objetivo con los pesos configurados
+    
+    Acepta escalares o vectores (un puntaje por partícula).
+    
+    Args:
+        puntaje_cobertura: Puntaje de cobertura espacial
+        puntaje_cultivos: Puntaje de balance entre cultivos
+        puntaje_criticas: Puntaje de cobertura de zonas críticas
+        puntaje_distribucion: Puntaje de distribución entre sensores
+    
+    Returns:
+        float o ndarray: Puntaje total [0,1]
+    """
+    pesos = CONFIG['pesos']
+    return (pesos['cobertura'] * puntaje_cobertura + 
+            pesos['balance_cultivos'] * puntaje_cultivos + 
+            pesos['zonas_criticas'] * puntaje_criticas + 
+            pesos['distribucion'] * puntaje_distribucion)
 
 def funcion_objetivo(ubicaciones_sensores, datos):
     """
@@ -178,7 +320,7 @@ def funcion_objetivo(ubicaciones_sensores, datos):
     - Distribución óptima
     
     Args:
-        ubicaciones_sensores: Lista de sensores [[lat, lon], ...]
+        ubicaciones_sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
         datos: DataFrame con puntos de muestreo
     
     Returns:
@@ -191,10 +333,128 @@ def funcion_objetivo(ubicaciones_sensores, datos):
     puntaje_distribucion = optimizar_distancias(ubicaciones_sensores)
     
     # Combinar con pesos definidos en configuración
-    pesos = CONFIG['pesos']
-    puntaje_total = (pesos['cobertura'] * puntaje_cobertura + 
-                     pesos['balance_cultivos'] * puntaje_cultivos + 
-                     pesos['zonas_criticas'] * puntaje_criticas + 
-                     pesos['distribucion'] * puntaje_distribucion)
+    return combinar_componentes(puntaje_cobertura, puntaje_cultivos,
+                                puntaje_criticas, puntaje_distribucion)
+
+def _distancia2_minima_enjambre(coords, sensores):
+    """
+    Distancia al cuadrado de cada punto a su sensor más cercano, por partícula
+    
+    Acumula el mínimo sensor por sensor, de modo que la memoria usada es
+    (P, N) en lugar de construir el tensor (P, N, S, 2) completo.
+    
+    Args:
+        coords: Arreglo (N, 2) de puntos
+        sensores: Arreglo (P, S, 2) de sensores por partícula
+    
+    Returns:
+        ndarray: Arreglo (P, N) de distancias mínimas al cuadrado
+    """
+    dist2_minima = np.full((sensores.shape[0], len(coords)), np.inf, dtype=coords.dtype)
+    for s in range(sensores.shape[1]):
+        diferencias = coords[None, :, :] - sensores[:, None, s, :]
+        np.minimum(dist2_minima, (diferencias**2).sum(-1), out=dist2_minima)
+    return dist2_minima
+
+def _cubiertos_enjambre(coords, sensores, radio):
+    """
+    Determinar qué puntos cubre cada partícula del enjambre
+    
+    Recorre los sensores uno a uno acumulando la cobertura, en lugar de
+    construir la matriz (P, N, S); las partículas que ya cubren todos los
+    puntos dejan de evaluarse y el recorrido termina cuando no queda ninguna.
+    
+    Args:
+        coords: Arreglo (N, 2) de puntos
+        sensores: Arreglo (P, S, 2) de sensores por partícula
+        radio: Radio máximo de cobertura (inclusive)
+    
+    Returns:
+        ndarray: Máscara booleana (P, N) de puntos cubiertos
+    """
+    radio2 = radio * radio
+    cubiertos = np.zeros((sensores.shape[0], len(coords)), dtype=bool)
+    pendientes = np.arange(sensores.shape[0])
+    for s in range(sensores.shape[1]):
+        diferencias = coords[None, :, :] - sensores[pendientes, None, s, :]
+        cubiertos_pendientes = cubiertos[pendientes] | ((diferencias**2).sum(-1) <= radio2)
+        cubiertos[pendientes] = cubiertos_pendientes
+        
+        # Salida temprana por partícula: descartar las que ya cubren todo
+        pendientes = pendientes[~cubiertos_pendientes.all(axis=1)]
+        if len(pendientes) == 0:
+            break
+    return cubiertos
+
+def evaluar_enjambre(particulas, precalculo):
+    """
+    Evaluar todas las partículas del enjambre en una sola pasada vectorizada
+    
+    Equivalente a aplicar funcion_objetivo a cada partícula, pero opera solo
+    sobre arreglos numpy y obtiene los cuatro componentes mediante
+    reducciones por eje. Si Numba está instalado se usa el núcleo compilado
+    de nucleos.py, que fusiona los cálculos sin tensores intermedios.
+    
+    Args:
+        particulas: Arreglo (P, 2S) con formato [lat1, lon1, lat2, lon2, ...] por fila
+        precalculo: Diccionario generado por precalcular_datos
     
-    return puntaje_total
\ No newline at end of file
+    Returns:
+        ndarray: Vector (P,) con el puntaje total de cada partícula
+    """
+    particulas = np.asarray(particulas, dtype=float)
+    n_particulas = particulas.shape[0]
+    
+    # Sensores en el mismo sistema relativo y en float32 que los puntos
+    sensores = (particulas.reshape(n_particulas, -1, 2) - precalculo['origen']).astype(np.float32)
+    
+    if NUMBA_DISPONIBLE:
+        return puntuar_enjambre(sensores, precalculo['coords'], precalculo['limites_cultivo'],
+                                precalculo['proporcion_cultivos'], precalculo['coords_criticas'],
+                                precalculo['parametros'], precalculo['pesos'])
+    
+    return _evaluar_enjambre_numpy(sensores, precalculo)
+
+def _evaluar_enjambre_numpy(sensores, precalculo):
+    """
+    Versión numpy de evaluar_enjambre usada cuando Numba no está disponible
+    
+    Args:
+        sensores: Arreglo (P, S, 2) de sensores por partícula
+        precalculo: Diccionario generado por precalcular_datos
+    
+    Returns:
+        ndarray: Vector (P,) con el puntaje total de cada partícula
+    """
+    n_particulas, n_sensores = sensores.shape[:2]
+    radio_influencia, radio_critico = precalculo['parametros'][1:3]
+    
+    # Cobertura espacial
+    puntaje_cobertura = _puntaje_cobertura(_distancia2_minima_enjambre(precalculo['coords'], sensores))
+    
+    # Balance entre cultivos
+    conteo_cubierto = np.stack([
+        _cubiertos_enjambre(coords_cultivo, sensores, radio_influencia).sum(axis=1)
+        for coords_cultivo in precalculo['coords_cultivo'].values()
+    ], axis=-1)
+    puntaje_cultivos = _puntaje_balance(conteo_cubierto, precalculo['conteo_cultivos'],
+                                        precalculo['proporcion_cultivos'])
+    
+    # Cobertura de zonas críticas
+    coords_criticas = precalculo['coords_criticas']
+    if len(coords_criticas) > 0:
+        puntaje_criticas = _cubiertos_enjambre(coords_criticas, sensores, radio_critico).mean(axis=1)
+    else:
+        puntaje_criticas = np.ones(n_particulas)
+    
+    # Distribución entre pares de sensores
+    if n_sensores <= 1:
+        puntaje_distribucion = np.ones(n_particulas)
+    else:
+        i, j = np.triu_indices(n_sensores, k=1)
+        dist_pares = np.sqrt(((sensores[:, i, :] - sensores[:, j, :])**2).sum(-1))
+        puntaje_distribucion = _puntaje_dispersion(dist_pares)
+    
+    # Combinar con pesos definidos en configuración
+    return combinar_componentes(puntaje_cobertura, puntaje_cultivos,
+                                puntaje_criticas, puntaje_distribucion)
\ No newline at end of file
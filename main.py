@@ -10,44 +10,49 @@ from algoritmo_pso import PSOOptimizer
 from visualizaciones import (visualizar_comparacion_configuraciones, visualizar_cobertura_detallada,
                            visualizar_analisis_eficiencia)
 
-def crear_datos_ejemplo():
+def crear_datos_ejemplo(semilla=42):
     """
     Generar datos de ejemplo para pruebas del sistema
     
+    Args:
+        semilla: Semilla del generador aleatorio
+    
     Returns:
         DataFrame: Datos simulados de cultivos con coordenadas geográficas
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(semilla)
     
     datos = {
-        'Humedad': np.random.uniform(5, 45, 100),
-        'Cultivo': np.random.choice(['Maíz', 'Tomate', 'Chile'], 100, p=[0.5, 0.3, 0.2]),
-        'Elevacion': np.random.uniform(10, 50, 100),
-        'Salinidad': np.random.uniform(0.5, 4.0, 100),
-        'Temperatura': np.random.uniform(20, 40, 100),
-        'Latitud': np.random.uniform(25.52, 25.62, 100),
-        'Longitud': np.random.uniform(-108.52, -108.42, 100)
+        'Humedad': rng.uniform(5, 45, 100),
+        'Cultivo': rng.choice(['Maíz', 'Tomate', 'Chile'], 100, p=[0.5, 0.3, 0.2]),
+        'Elevacion': rng.uniform(10, 50, 100),
+        'Salinidad': rng.uniform(0.5, 4.0, 100),
+        'Temperatura': rng.uniform(20, 40, 100),
+        'Latitud': rng.uniform(25.52, 25.62, 100),
+        'Longitud': rng.uniform(-108.52, -108.42, 100)
     }
     
     return pd.DataFrame(datos)
 
-def comparar_configuraciones_manuales(datos, n_sensores=5):
+def comparar_configuraciones_manuales(datos, n_sensores=5, rng=None):
     """
     Comparar diferentes estrategias manuales de ubicación de sensores
     
     Args:
         datos: DataFrame con datos de cultivos
         n_sensores: Número de sensores a ubicar
+        rng: Generador aleatorio numpy compartido por las estrategias (opcional)
     
     Returns:
         dict: Configuraciones y sus puntajes
     """
     print("Comparando configuraciones manuales...")
     
+    rng = np.random.default_rng() if rng is None else rng
     configuraciones = {
-        'Aleatoria': configuracion_aleatoria(n_sensores, datos),
-        'Centros Cultivo': configuracion_centros_cultivo(n_sensores, datos),
-        'Zonas Criticas': configuracion_zonas_criticas(n_sensores, datos)
+        'Aleatoria': configuracion_aleatoria(n_sensores, datos, rng),
+        'Centros Cultivo': configuracion_centros_cultivo(n_sensores, datos, rng),
+        'Zonas Criticas': configuracion_zonas_criticas(n_sensores, datos, rng)
     }
     
     # Mostrar puntajes de configuraciones manuales
@@ -59,7 +64,7 @@ def comparar_configuraciones_manuales(datos, n_sensores=5):
     
     return configuraciones
 
-def ejecutar_optimizacion_pso(datos, n_sensores=5, n_particulas=25, max_iter=80):
+def ejecutar_optimizacion_pso(datos, n_sensores=5, n_particulas=25, max_iter=80, semilla=None):
     """
     Ejecutar optimización con algoritmo PSO
     
@@ -68,13 +73,15 @@ def ejecutar_optimizacion_pso(datos, n_sensores=5, n_particulas=25, max_iter=80)
         n_sensores: Número de sensores a optimizar
         n_particulas: Tamaño del enjambre
         max_iter: Número máximo de iteraciones
+        semilla: Semilla del generador aleatorio del PSO
     
     Returns:
         tuple: (sensores_optimos, puntaje_optimo)
     """
     print("\nEjecutando optimizacion PSO...")
     
-    pso = PSOOptimizer(datos, n_sensores=n_sensores, n_particulas=n_particulas, max_iter=max_iter)
+    pso = PSOOptimizer(datos, n_sensores=n_sensores, n_particulas=n_particulas, max_iter=max_iter,
+                       semilla=semilla)
     sensores_optimos, puntaje_optimo = pso.optimizar()
     
     # Mostrar curva de convergencia
@@ -108,13 +115,12 @@ def mostrar_resultados_finales(configuraciones, sensores_pso, puntaje_pso, datos
     print("="*60)
     
     from funciones_objetivo import funcion_objetivo
-    for nombre, sensores in configuraciones.items():
-        puntaje = funcion_objetivo(sensores, datos)
+    puntajes = {nombre: funcion_objetivo(sensores, datos) for nombre, sensores in configuraciones.items()}
+    for nombre, puntaje in puntajes.items():
         print(f"{nombre:<20}: {puntaje:.4f}")
     
-    # Calcular mejora del PSO
-    mejor_manual = max([funcion_objetivo(sensores, datos) 
-                       for nombre, sensores in configuraciones.items() if nombre != 'PSO Optimo'])
+    # Calcular mejora del PSO reutilizando los puntajes ya calculados
+    mejor_manual = max(puntaje for nombre, puntaje in puntajes.items() if nombre != 'PSO Optimo')
     mejora = ((puntaje_pso - mejor_manual) / mejor_manual) * 100
     
     print(f"\nMejora del PSO sobre mejor metodo manual: {mejora:+.1f}%")
@@ -141,11 +147,12 @@ def main():
     
     # Paso 2: Comparar métodos manuales
     print("\n2. COMPARANDO ESTRATEGIAS MANUALES...")
-    configuraciones = comparar_configuraciones_manuales(datos, n_sensores=5)
+    configuraciones = comparar_configuraciones_manuales(datos, n_sensores=5, rng=np.random.default_rng(42))
     
     # Paso 3: Optimización con PSO
     print("\n3. OPTIMIZACION CON ALGORITMO PSO...")
-    sensores_pso, puntaje_pso = ejecutar_optimizacion_pso(datos, n_sensores=5, n_particulas=25, max_iter=80)
+    sensores_pso, puntaje_pso = ejecutar_optimizacion_pso(datos, n_sensores=5, n_particulas=25, max_iter=80,
+                                                          semilla=42)
     
     # Paso 4: Resultados y análisis
     print("\n4. ANALISIS DE RESULTADOS...")
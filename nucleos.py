@@ -0,0 +1,153 @@
+"""
+Núcleos de cálculo compilados con Numba para la función objetivo
+Evalúan el enjambre completo sin generar tensores intermedios de distancias
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    NUMBA_DISPONIBLE = True
+except ImportError:  # Numba es opcional; se usa la versión numpy en su lugar
+    NUMBA_DISPONIBLE = False
+
+# fastmath sin 'nnan' ni 'ninf': las distancias mínimas arrancan en np.inf
+_FASTMATH = {'nsz', 'arcp', 'contract', 'afn', 'reassoc'}
+
+if NUMBA_DISPONIBLE:
+
+    @njit(parallel=True, fastmath=_FASTMATH, cache=True, boundscheck=False)
+    def puntuar_enjambre(sensores, coords, limites_cultivo, proporcion_cultivos,
+                         coords_criticas, parametros, pesos):
+        """
+        Evaluar la función objetivo para todas las partículas del enjambre
+        
+        Cada partícula se procesa en un hilo; las distancias mínimas y los
+        conteos de cobertura se acumulan en escalares en lugar de matrices.
+        Los puntos llegan ordenados por cultivo, así que cada cultivo se
+        recorre como un segmento contiguo sin consultar su etiqueta punto a
+        punto.
+        
+        Args:
+            sensores: Arreglo (P, S, 2) de sensores por partícula
+            coords: Arreglo (N, 2) de puntos de muestreo ordenados por cultivo
+            limites_cultivo: Arreglo (C + 2,) con el inicio de cada segmento; el
+                             último segmento agrupa los puntos de otros cultivos
+            proporcion_cultivos: Arreglo (C,) con la fracción de puntos de cada cultivo
+            coords_criticas: Arreglo (M, 2) de puntos en zonas críticas
+            parametros: [radio_cobertura, radio_influencia, radio_critico, distancia_ideal]
+            pesos: [cobertura, balance_cultivos, zonas_criticas, distribucion]
+        
+        Returns:
+            ndarray: Vector (P,) con el puntaje total de cada partícula
+        """
+        n_particulas = sensores.shape[0]
+        n_sensores = sensores.shape[1]
+        n_puntos = coords.shape[0]
+        n_criticas = coords_criticas.shape[0]
+        n_cultivos = proporcion_cultivos.shape[0]
+        n_segmentos = limites_cultivo.shape[0] - 1
+        
+        radio_cobertura = parametros[0]
+        radio_cobertura2 = radio_cobertura * radio_cobertura
+        radio_influencia2 = parametros[1] * parametros[1]
+        radio_critico2 = parametros[2] * parametros[2]
+        dist_ideal = parametros[3]
+        
+        puntajes = np.empty(n_particulas)
+        
+        for p in prange(n_particulas):
+            # Cobertura espacial y balance entre cultivos, segmento por segmento
+            cobertura = 0.0
+            balance = 0.0
+            for c in range(n_segmentos):
+                inicio = limites_cultivo[c]
+                fin = limites_cultivo[c + 1]
+                cubiertos = 0.0
+                for k in range(inicio, fin):
+                    dist2_minima = np.inf
+                    for s in range(n_sensores):
+                        dx = coords[k, 0] - sensores[p, s, 0]
+                        dy = coords[k, 1] - sensores[p, s, 1]
+                        d2 = dx*dx + dy*dy
+                        if d2 < dist2_minima:
+                            dist2_minima = d2
+                    
+                    if dist2_minima <= radio_cobertura2:
+                        cobertura += 1.0
+                    else:
+                        cobertura += max(0.0, 1.0 - (np.sqrt(dist2_minima) - radio_cobertura)
+                                         / (2 * radio_cobertura))
+                    
+                    if dist2_minima <= radio_influencia2:
+                        cubiertos += 1.0
+                
+                if c < n_cultivos:
+                    cobertura_real = cubiertos / (fin - inicio)
+                    balance += min(1.0 - abs(proporcion_cultivos[c] - cobertura_real), 1.0)
+            cobertura /= n_puntos
+            balance /= n_cultivos
+            
+            # Cobertura de zonas críticas
+            if n_criticas == 0:
+                criticas = 1.0
+            else:
+                criticas = 0.0
+                for k in range(n_criticas):
+                    for s in range(n_sensores):
+                        dx = coords_criticas[k, 0] - sensores[p, s, 0]
+                        dy = coords_criticas[k, 1] - sensores[p, s, 1]
+                        if dx*dx + dy*dy <= radio_critico2:
+                            criticas += 1.0
+                            break
+                criticas /= n_criticas
+            
+            # Distribución entre pares de sensores
+            if n_sensores <= 1:
+                distribucion = 1.0
+            else:
+                distribucion = 0.0
+                for i in range(n_sensores):
+                    for j in range(i + 1, n_sensores):
+                        dx = sensores[p, i, 0] - sensores[p, j, 0]
+                        dy = sensores[p, i, 1] - sensores[p, j, 1]
+                        dist = np.sqrt(dx*dx + dy*dy)
+                        if dist >= dist_ideal * 0.7 and dist <= dist_ideal * 1.3:
+                            distribucion += 1.0
+                        else:
+                            distribucion += max(0.0, 1.0 - abs(dist - dist_ideal) / dist_ideal)
+                distribucion /= n_sensores * (n_sensores - 1) / 2
+            
+            puntajes[p] = (pesos[0] * cobertura + pesos[1] * balance +
+                           pesos[2] * criticas + pesos[3] * distribucion)
+        
+        return puntajes
+    
+    @njit(parallel=True, fastmath=_FASTMATH, cache=True)
+    def puntos_dentro_de_radio(pts_lat, pts_lon, sens_lat, sens_lon, radio2):
+        """
+        Marcar los puntos que tienen al menos un sensor a distancia <= radio
+        
+        El recorrido de sensores de cada punto termina en el primer acierto.
+        
+        Args:
+            pts_lat, pts_lon: Arreglos (N,) con las coordenadas de los puntos
+            sens_lat, sens_lon: Arreglos (S,) con las coordenadas de los sensores
+            radio2: Radio al cuadrado
+        
+        Returns:
+            ndarray: Máscara booleana (N,) de puntos cubiertos
+        """
+        n_puntos = pts_lat.shape[0]
+        n_sensores = sens_lat.shape[0]
+        cubiertos = np.zeros(n_puntos, dtype=np.bool_)
+        
+        for i in prange(n_puntos):
+            for s in range(n_sensores):
+                dx = pts_lat[i] - sens_lat[s]
+                dy = pts_lon[i] - sens_lon[s]
+                if dx*dx + dy*dy <= radio2:
+                    cubiertos[i] = True
+                    break
+        
+        return cubiertos
\ No newline at end of file
@@ -3,52 +3,336 @@ Módulo de visualización para el proyecto PSO de optimización de riego
 Genera gráficos y mapas para analizar resultados y configuraciones
 """
 
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
+import pandas as pd
 import matplotlib.pyplot as plt
+from matplotlib.collections import EllipseCollection
+from matplotlib.lines import Line2D
 from math import pi  # Corregido: sin guión bajo
 from scipy.spatial import Delaunay  # Corregido: sin guión bajo
+from scipy.spatial.distance import pdist
 from config import CONFIG
 from funciones_objetivo import (  # Corregido: "objetivo" no "objectivo"
     calcular_cobertura_variabilidad, 
     balance_entre_cultivos,
     cubrir_zonas_problematicas, 
     optimizar_distancias, 
-    funcion_objetivo  # Corregido: "objetivo" no "objectivo"
+    combinar_componentes,
+    identificar_zonas_criticas,
+    obtener_coordenadas
 )
+from nucleos import NUMBA_DISPONIBLE
+
+if NUMBA_DISPONIBLE:
+    from nucleos import puntos_dentro_de_radio
+
+CULTIVOS = ['Maíz', 'Tomate', 'Chile']
+COLORES_CULTIVO = ['green', 'red', 'orange']
+
+# Máximo de puntos de muestreo enviados a scatter; por encima se dibuja una
+# muestra aleatoria fija y las métricas se siguen calculando con todos
+MAX_PUNTOS_GRAFICO = 50000
+
+# A partir de este número de marcadores se omiten transparencia y bordes, que
+# llevan a matplotlib por la ruta lenta de composición punto a punto
+LIMITE_TRANSPARENCIA = 5000
+
+# Motores de dibujo para la capa de puntos de muestreo; datashader y
+# jupyter-scatter son opcionales y se importan solo al pedirlos
+BACKENDS = ('matplotlib', 'datashader', 'jscatter')
+
+def _validar_backend(backend):
+    """
+    Verificar que el motor de dibujo solicitado sea uno de BACKENDS
+    
+    Args:
+        backend: Nombre del motor de dibujo
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend desconocido '{backend}', opciones: {', '.join(BACKENDS)}")
+
+def _estilo_scatter(n_puntos, **estilo):
+    """
+    Quitar alpha y edgecolors de los argumentos de scatter en capas grandes
+    
+    Args:
+        n_puntos: Número de marcadores de la capa
+        **estilo: Argumentos de scatter
+    
+    Returns:
+        dict: Argumentos a usar para la capa
+    """
+    if n_puntos >= LIMITE_TRANSPARENCIA:
+        estilo.pop('alpha', None)
+        estilo.pop('edgecolors', None)
+    return estilo
 
-def visualizar_comparacion_configuraciones(configuraciones, datos):
+def _muestra_grafico(datos):
+    """
+    Reducir los puntos de muestreo a dibujar cuando superan MAX_PUNTOS_GRAFICO
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+    
+    Returns:
+        DataFrame: Los mismos datos, o una muestra reproducible de MAX_PUNTOS_GRAFICO filas
+    """
+    if len(datos) <= MAX_PUNTOS_GRAFICO:
+        return datos
+    return datos.sample(n=MAX_PUNTOS_GRAFICO, random_state=0)
+
+def _como_arreglo_sensores(sensores):
+    """
+    Convertir una configuración de sensores a un arreglo float64 contiguo
+    
+    Las funciones públicas lo llaman una sola vez al entrar, de modo que una
+    lista de listas se convierte una vez y el resto trabaja con el arreglo.
+    
+    Args:
+        sensores: Arreglo o lista (S, 2) de sensores [[lat, lon], ...]
+    
+    Returns:
+        ndarray: Arreglo (S, 2) float64 en orden C (sin copia si ya lo es)
+    """
+    return np.ascontiguousarray(sensores, dtype=np.float64)
+
+# Componentes de la función objetivo ya calculados, por (sensores, id(datos));
+# cada entrada guarda también los datos para que su id no se reutilice
+_cache_componentes = OrderedDict()
+MAX_CACHE_COMPONENTES = 64
+
+def _componentes_objetivo(sensores, datos):
+    """
+    Calcular los cuatro componentes de la función objetivo, con memoria
+    
+    Una misma configuración se puntúa varias veces entre las distintas
+    gráficas; se asume que los datos no se modifican durante la sesión.
+    
+    Args:
+        sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
+        datos: DataFrame con puntos de muestreo
+    
+    Returns:
+        tuple: (cobertura, balance, zonas_criticas, distribucion)
+    """
+    sensores_array = _como_arreglo_sensores(sensores)
+    clave = (sensores_array.tobytes(), sensores_array.shape, id(datos))
+    entrada = _cache_componentes.get(clave)
+    if entrada is not None and entrada[0] is datos:
+        _cache_componentes.move_to_end(clave)
+        return entrada[1]
+    
+    componentes = (calcular_cobertura_variabilidad(sensores_array, datos),
+                   balance_entre_cultivos(sensores_array, datos),
+                   cubrir_zonas_problematicas(sensores_array, datos),
+                   optimizar_distancias(sensores_array))
+    _cache_componentes[clave] = (datos, componentes)
+    if len(_cache_componentes) > MAX_CACHE_COMPONENTES:
+        _cache_componentes.popitem(last=False)
+    return componentes
+
+def _puntos_cubiertos(pts, sensores_array, radio):
+    """
+    Marcar los puntos con algún sensor a distancia <= radio
+    
+    Usa el núcleo compilado si Numba está disponible y, si no, una matriz de
+    distancias al cuadrado entre todos los puntos y sensores.
+    
+    Args:
+        pts: Arreglo (N, 2) de puntos [lat, lon]
+        sensores_array: Arreglo (S, 2) float64 de _como_arreglo_sensores
+        radio: Radio de cobertura
+    
+    Returns:
+        ndarray: Máscara booleana (N,) de puntos cubiertos
+    """
+    # Columnas de latitud y longitud como vectores contiguos
+    pts_lat, pts_lon = np.ascontiguousarray(pts.T, dtype=np.float64)
+    sens_lat, sens_lon = np.ascontiguousarray(sensores_array.T)
+    
+    # Comparar distancias al cuadrado: la raíz no cambia el resultado
+    radio2 = radio * radio
+    if NUMBA_DISPONIBLE:
+        return puntos_dentro_de_radio(pts_lat, pts_lon, sens_lat, sens_lon, radio2)
+    
+    d2 = (pts_lat[:, None] - sens_lat)**2 + (pts_lon[:, None] - sens_lon)**2
+    return (d2 <= radio2).any(axis=1)
+
+def _puntos_por_cultivo(datos):
+    """
+    Separar las coordenadas de los puntos de muestreo por cultivo
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+    
+    Returns:
+        dict: {cultivo: arreglo (M, 2) de [lat, lon]}
+    """
+    return {cultivo: datos.loc[datos['Cultivo'] == cultivo, ['Latitud', 'Longitud']].to_numpy()
+            for cultivo in CULTIVOS}
+
+def _rasterizar_cultivos(datos, resolucion=600):
+    """
+    Rasterizar los puntos de muestreo por cultivo con datashader
+    
+    Para conjuntos grandes la imagen se dibuja una sola vez con imshow en vez
+    de enviar cada punto a scatter.
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+        resolucion: Ancho y alto del lienzo en píxeles
+    
+    Returns:
+        tuple: (imagen, extent) listos para ax.imshow
+    """
+    import datashader as ds
+    import datashader.transfer_functions as tf
+    
+    puntos = datos.loc[datos['Cultivo'].isin(CULTIVOS), ['Longitud', 'Latitud']]
+    puntos['Cultivo'] = pd.Categorical(datos.loc[puntos.index, 'Cultivo'], categories=CULTIVOS)
+    rango_x = (puntos['Longitud'].min(), puntos['Longitud'].max())
+    rango_y = (puntos['Latitud'].min(), puntos['Latitud'].max())
+    
+    lienzo = ds.Canvas(plot_width=resolucion, plot_height=resolucion, x_range=rango_x, y_range=rango_y)
+    agregado = lienzo.points(puntos, 'Longitud', 'Latitud', ds.count_cat('Cultivo'))
+    imagen = tf.spread(tf.shade(agregado, color_key=dict(zip(CULTIVOS, COLORES_CULTIVO))), px=2)
+    return imagen.to_pil(), (*rango_x, *rango_y)
+
+def _dibujar_cultivos(ax, puntos_por_cultivo=None, raster=None, alpha=0.5, s=30):
+    """
+    Dibujar la capa de puntos de muestreo por cultivo
+    
+    Cada cultivo es de un solo color, así que se dibuja con plot (solo
+    marcadores), que evita el costo por punto de scatter.
+    
+    Args:
+        ax: Eje de matplotlib
+        puntos_por_cultivo: {cultivo: arreglo (M, 2)} de _puntos_por_cultivo
+        raster: (imagen, extent) de _rasterizar_cultivos; si se da, se usa en lugar de los marcadores
+        alpha: Transparencia de los marcadores
+        s: Área de los marcadores en puntos², como en scatter
+    """
+    # zorder de las colecciones para respetar el orden de dibujo frente a los sensores
+    estilo = dict(linestyle='', marker='o', markersize=np.sqrt(s), zorder=1)
+    
+    if raster is None:
+        for (cultivo, puntos), color in zip(puntos_por_cultivo.items(), COLORES_CULTIVO):
+            ax.plot(puntos[:, 1], puntos[:, 0], color=color, label=cultivo,
+                    **_estilo_scatter(len(puntos), alpha=alpha, **estilo))
+        return
+    
+    imagen, extension = raster
+    ax.imshow(imagen, extent=extension, origin='upper', aspect='auto', zorder=0)
+    
+    # La imagen no aporta entradas a la leyenda: añadir marcadores vacíos
+    for cultivo, color in zip(CULTIVOS, COLORES_CULTIVO):
+        ax.plot([], [], color=color, label=cultivo, alpha=alpha, **estilo)
+
+def _scatter_interactivo(datos, sensores):
+    """
+    Crear un gráfico WebGL de jupyter-scatter con los puntos y los sensores
+    
+    Args:
+        datos: DataFrame con puntos de muestreo
+        sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
+    
+    Returns:
+        jscatter.Scatter: Gráfico interactivo coloreado por cultivo
+    """
+    import jscatter
+    
+    sensores_array = _como_arreglo_sensores(sensores)
+    puntos = pd.concat([
+        datos.loc[datos['Cultivo'].isin(CULTIVOS), ['Latitud', 'Longitud', 'Cultivo']],
+        pd.DataFrame({'Latitud': sensores_array[:, 0], 'Longitud': sensores_array[:, 1], 'Cultivo': 'Sensor'})
+    ], ignore_index=True)
+    return jscatter.Scatter(data=puntos, x='Longitud', y='Latitud', color_by='Cultivo',
+                            color_map=dict(zip(CULTIVOS + ['Sensor'], COLORES_CULTIVO + ['blue'])))
+
+@lru_cache(maxsize=32)
+def _simplices_delaunay(sensores_bytes, n_sensores):
+    """
+    Triangular un arreglo de sensores serializado (memorizado por contenido)
+    
+    Args:
+        sensores_bytes: Bytes de un arreglo (S, 2) float64
+        n_sensores: Número de sensores S
+    
+    Returns:
+        ndarray: Simplices de la triangulación de Delaunay
+    """
+    return Delaunay(np.frombuffer(sensores_bytes).reshape(n_sensores, 2)).simplices
+
+def _triangulacion_sensores(sensores_array):
+    """
+    Obtener la triangulación de Delaunay de los sensores si está definida
+    
+    Args:
+        sensores_array: Arreglo (S, 2) float64 de _como_arreglo_sensores
+    
+    Returns:
+        ndarray o None: Simplices, o None si hay menos de 3 sensores o son colineales
+    """
+    if len(sensores_array) < 3:
+        return None
+    
+    # Sensores colineales no forman triángulos: evitar arrancar QHull en vano
+    if np.linalg.matrix_rank(sensores_array - sensores_array.mean(axis=0), tol=1e-9) < 2:
+        return None
+    
+    return _simplices_delaunay(sensores_array.tobytes(), len(sensores_array))
+
+def visualizar_comparacion_configuraciones(configuraciones, datos, backend='matplotlib'):
     """
     Comparar visualmente diferentes configuraciones de sensores
     
     Args:
-        configuraciones: Diccionario {nombre: lista_de_sensores}
+        configuraciones: Diccionario {nombre: arreglo_de_sensores}
         datos: DataFrame con puntos de muestreo
+        backend: 'matplotlib', 'datashader' (puntos rasterizados) o 'jscatter' (WebGL)
+    
+    Returns:
+        Widget de jupyter-scatter si backend es 'jscatter', None en otro caso
     """
+    _validar_backend(backend)
+    if backend == 'jscatter':
+        import jscatter
+        return jscatter.compose([(_scatter_interactivo(datos, sensores), nombre)
+                                 for nombre, sensores in configuraciones.items()], sync_view=True)
+    
     fig, axes = plt.subplots(2, 2, figsize=(15, 12))
     axes = axes.flatten()
     
+    # Los puntos por cultivo y las zonas críticas no dependen de la configuración;
+    # los puntajes usan siempre todos los datos
+    datos_grafico = _muestra_grafico(datos)
+    if backend == 'datashader':
+        puntos_por_cultivo, raster = None, _rasterizar_cultivos(datos)
+    else:
+        puntos_por_cultivo, raster = _puntos_por_cultivo(datos_grafico), None
+    zonas_criticas = obtener_coordenadas(datos_grafico.loc[identificar_zonas_criticas(datos_grafico)])
+    
     for idx, (nombre, sensores) in enumerate(configuraciones.items()):
         if idx >= len(axes):
             break
             
         ax = axes[idx]
-        puntaje = funcion_objetivo(sensores, datos)
+        puntaje = combinar_componentes(*_componentes_objetivo(sensores, datos))
         
         # Colores por cultivo
-        for cultivo, color in zip(['Maíz', 'Tomate', 'Chile'], ['green', 'red', 'orange']):
-            puntos_cultivo = datos[datos['Cultivo'] == cultivo]
-            ax.scatter(puntos_cultivo['Longitud'], puntos_cultivo['Latitud'], 
-                      c=color, label=cultivo, alpha=0.5, s=30)
+        _dibujar_cultivos(ax, puntos_por_cultivo, raster, alpha=0.5, s=30)
         
         # Sensores
-        sensores_array = np.array(sensores)
-        ax.scatter(sensores_array[:, 1], sensores_array[:, 0], 
-                  c='blue', marker='X', s=150, label='Sensores', edgecolors='black')
+        sensores_array = _como_arreglo_sensores(sensores)
+        ax.scatter(sensores_array[:, 1], sensores_array[:, 0], c='blue',
+                  **_estilo_scatter(len(sensores_array), marker='X', s=150, label='Sensores', edgecolors='black'))
         
         # Zonas críticas
-        zonas_criticas = datos[(datos['Salinidad'] > 2.5) | (datos['Humedad'] < 15) | (datos['Humedad'] > 40)]
-        ax.scatter(zonas_criticas['Longitud'], zonas_criticas['Latitud'],
-                  c='black', marker='s', s=50, label='Zonas Criticas', alpha=0.8)
+        ax.scatter(zonas_criticas[:, 1], zonas_criticas[:, 0], c='black',
+                  **_estilo_scatter(len(zonas_criticas), marker='s', s=50, label='Zonas Criticas', alpha=0.8))
         
         ax.set_xlabel('Longitud')
         ax.set_ylabel('Latitud')
@@ -65,6 +349,112 @@ def visualizar_comparacion_configuraciones(configuraciones, datos):
     plt.tight_layout()
     plt.show()
 
+def _controles_sensores(fig, ejes, marcadores, circulos, sensores_array):
+    """
+    Añadir deslizadores para mover un sensor, redibujándolo con blitting
+    
+    Los puntos de muestreo y las zonas críticas se guardan como fondo; al
+    mover un deslizador solo se vuelven a dibujar los sensores, sus círculos
+    y los propios deslizadores. Esos artistas quedan animados, por lo que
+    savefig y los redibujados normales de la figura no los incluyen.
+    
+    Args:
+        fig: Figura de matplotlib
+        ejes: Ejes donde se muestran los sensores
+        marcadores: Colecciones de marcadores de sensores, una por eje
+        circulos: Colecciones de círculos de sensores, una por eje
+        sensores_array: Arreglo (S, 2) de sensores; se actualiza al mover los deslizadores
+    
+    Returns:
+        tuple: Deslizadores (sensor, latitud, longitud); mantener la referencia para que sigan activos
+    """
+    from matplotlib.widgets import Slider
+    
+    fig.subplots_adjust(bottom=0.25)
+    lat_min, lat_max = ejes[0].get_ylim()
+    lon_min, lon_max = ejes[0].get_xlim()
+    n_sensores = len(sensores_array)
+    deslizador_sensor = Slider(fig.add_axes([0.15, 0.12, 0.7, 0.03]), 'Sensor', 1, max(n_sensores, 2),
+                               valinit=1, valstep=1)
+    deslizador_lat = Slider(fig.add_axes([0.15, 0.07, 0.7, 0.03]), 'Latitud', lat_min, lat_max,
+                            valinit=sensores_array[0, 0])
+    deslizador_lon = Slider(fig.add_axes([0.15, 0.02, 0.7, 0.03]), 'Longitud', lon_min, lon_max,
+                            valinit=sensores_array[0, 1])
+    deslizadores = (deslizador_sensor, deslizador_lat, deslizador_lon)
+    
+    # Los artistas animados quedan fuera del dibujado normal y se pintan sobre el fondo
+    dinamicos = marcadores + circulos + [deslizador.ax for deslizador in deslizadores]
+    for artista in dinamicos:
+        artista.set_animated(True)
+    for deslizador in deslizadores:
+        deslizador.drawon = False
+    fondo = []
+    
+    def dibujar_dinamicos():
+        for artista in dinamicos:
+            fig.draw_artist(artista)
+    
+    def al_dibujar(evento):
+        # Recapturar el fondo tras cada dibujado completo (zoom, cambio de tamaño)
+        fondo[:] = [fig.canvas.copy_from_bbox(fig.bbox)]
+        dibujar_dinamicos()
+    
+    def sensor_elegido():
+        return min(int(deslizador_sensor.val), n_sensores) - 1
+    
+    def al_seleccionar(valor):
+        # Sincronizar ambos deslizadores sin que al_mover escriba una posición
+        # mezclada (latitud nueva con la longitud del sensor anterior)
+        i = sensor_elegido()
+        for deslizador in (deslizador_lat, deslizador_lon):
+            deslizador.eventson = False
+        deslizador_lat.set_val(sensores_array[i, 0])
+        deslizador_lon.set_val(sensores_array[i, 1])
+        for deslizador in (deslizador_lat, deslizador_lon):
+            deslizador.eventson = True
+        al_mover(None)
+    
+    def al_mover(valor):
+        i = sensor_elegido()
+        sensores_array[i] = deslizador_lat.val, deslizador_lon.val
+        centros = sensores_array[:, [1, 0]]
+        for marcador, circulo in zip(marcadores, circulos):
+            marcador.set_offsets(centros)
+            circulo.set_offsets(centros)
+        if not fondo:
+            return
+        
+        fig.canvas.restore_region(fondo[0])
+        dibujar_dinamicos()
+        fig.canvas.blit(fig.bbox)
+    
+    fig.canvas.mpl_connect('draw_event', al_dibujar)
+    deslizador_sensor.on_changed(al_seleccionar)
+    deslizador_lat.on_changed(al_mover)
+    deslizador_lon.on_changed(al_mover)
+    return deslizadores
+
+# Figura del gráfico radar, reutilizada entre llamadas mientras siga abierta
+_radar_cache = {}
+
+def _ejes_radar():
+    """
+    Obtener la figura y los ejes polares del gráfico radar
+    
+    Returns:
+        tuple: (fig, ax) limpios; se crean solo si no hay una figura abierta
+    """
+    fig = _radar_cache.get('fig')
+    if fig is not None and plt.fignum_exists(fig.number):
+        ax = _radar_cache['ax']
+        ax.cla()
+        plt.figure(fig.number)  # Figura actual para plt.title y plt.legend
+        return fig, ax
+    
+    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+    _radar_cache.update(fig=fig, ax=ax)
+    return fig, ax
+
 def visualizar_radar_componentes(puntajes, titulo="Analisis de Componentes"):
     """
     Crear gráfico radar para visualizar balance entre componentes de la función objetivo
@@ -78,10 +468,10 @@ def visualizar_radar_componentes(puntajes, titulo="Analisis de Componentes"):
     
     # Cerrar el gráfico repitiendo el primer valor
     valores += valores[:1]
-    angulos = [n / float(len(componentes)) * 2 * pi for n in range(len(componentes))]
-    angulos += angulos[:1]
+    angulos = np.linspace(0, 2 * pi, len(componentes), endpoint=False)
+    angulos = np.concatenate([angulos, angulos[:1]])
     
-    fig, ax = plt.subplots(figsize=(8, 8), subplot_kw=dict(projection='polar'))
+    fig, ax = _ejes_radar()
     ax.plot(angulos, valores, 'o-', linewidth=2, label='Puntajes')
     ax.fill(angulos, valores, alpha=0.25)
     ax.set_theta_offset(pi / 2)
@@ -95,98 +485,118 @@ def visualizar_radar_componentes(puntajes, titulo="Analisis de Componentes"):
     plt.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0))
     plt.show()
 
-def visualizar_cobertura_detallada(sensores, datos, titulo="Mapa de Cobertura Detallada"):
+def visualizar_cobertura_detallada(sensores, datos, titulo="Mapa de Cobertura Detallada", backend='matplotlib',
+                                   interactivo=False):
     """
     Visualizar configuración de sensores con áreas de cobertura e influencia
     
     Args:
-        sensores: Lista de sensores [[lat, lon], ...]
+        sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
         datos: DataFrame con puntos de muestreo
         titulo: Título del gráfico
+        backend: 'matplotlib', 'datashader' (puntos rasterizados) o 'jscatter' (WebGL)
+        interactivo: Añadir deslizadores para mover sensores (redibujado con blitting);
+                     los sensores y sus círculos no aparecen al guardar la figura
+                     con savefig, que debe hacerse con interactivo=False
+    
+    Returns:
+        Widget de jupyter-scatter si backend es 'jscatter', los deslizadores si
+        interactivo es True, None en otro caso
     """
+    _validar_backend(backend)
+    if backend == 'jscatter':
+        return _scatter_interactivo(datos, sensores).show()
+    
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(16, 6))
     
     # Colores distintos para cada sensor
     colores_sensores = ['red', 'blue', 'green', 'orange', 'purple', 'brown', 'pink', 'gray']
     
-    # Plotear puntos de datos por cultivo
-    for cultivo, color in zip(['Maíz', 'Tomate', 'Chile'], ['green', 'red', 'orange']):
-        puntos_cultivo = datos[datos['Cultivo'] == cultivo]
-        ax1.scatter(puntos_cultivo['Longitud'], puntos_cultivo['Latitud'], 
-                   c=color, label=cultivo, alpha=0.6, s=40)
-        ax2.scatter(puntos_cultivo['Longitud'], puntos_cultivo['Latitud'], 
-                   c=color, label=cultivo, alpha=0.6, s=40)
-    
-    # Plotear sensores y áreas de cobertura
-    for i, sensor in enumerate(sensores):
-        color_sensor = colores_sensores[i % len(colores_sensores)]
-        
-        # Marcador de sensor
-        ax1.scatter(sensor[1], sensor[0], c=color_sensor, marker='X', s=200, 
-                   label=f'Sensor {i+1}', edgecolors='black', linewidth=2)
-        ax2.scatter(sensor[1], sensor[0], c=color_sensor, marker='X', s=200, 
-                   label=f'Sensor {i+1}', edgecolors='black', linewidth=2)
+    # Plotear puntos de datos por cultivo (muestreados si son demasiados)
+    datos_grafico = _muestra_grafico(datos)
+    if backend == 'datashader':
+        puntos_por_cultivo, raster = None, _rasterizar_cultivos(datos)
+    else:
+        puntos_por_cultivo, raster = _puntos_por_cultivo(datos_grafico), None
+    for ax in (ax1, ax2):
+        _dibujar_cultivos(ax, puntos_por_cultivo, raster, alpha=0.6, s=40)
+    
+    # Marcadores de sensores: una sola llamada por eje con un color por sensor
+    sensores_array = _como_arreglo_sensores(sensores)
+    colores = [colores_sensores[i % len(colores_sensores)] for i in range(len(sensores_array))]
+    marcadores = []
+    for ax in (ax1, ax2):
+        marcadores.append(ax.scatter(sensores_array[:, 1], sensores_array[:, 0], c=colores,
+                                     **_estilo_scatter(len(sensores_array), marker='X', s=200,
+                                                       edgecolors='black', linewidth=2)))
+    
+    # Entradas de leyenda de los sensores, que ya no llevan etiqueta propia
+    leyenda_sensores = [Line2D([0], [0], linestyle='', marker='X', markersize=12, markerfacecolor=color,
+                               markeredgecolor='black', label=f'Sensor {i+1}')
+                        for i, color in enumerate(colores)]
+    
+    # Círculos de cobertura básica e influencia, una colección por eje. El
+    # tamaño va en unidades de datos (units='xy'): un scatter con s en puntos²
+    # sería igual de barato pero perdería la escala al hacer zoom y no puede
+    # deformarse con la relación de aspecto distinta de latitud y longitud
+    centros = sensores_array[:, [1, 0]]
+    angulos = np.zeros(len(sensores_array))
+    circulos = []
+    for ax, radio, alpha in ((ax1, CONFIG['radio_cobertura'], 0.2), (ax2, CONFIG['radio_influencia'], 0.1)):
+        diametros = np.full(len(sensores_array), 2 * radio)
+        circulos.append(ax.add_collection(EllipseCollection(diametros, diametros, angulos,
+                                                            units='xy', offsets=centros,
+                                                            offset_transform=ax.transData,
+                                                            facecolors=colores, edgecolors=colores, alpha=alpha)))
         
-        # Círculo de cobertura básica
-        circulo_cobertura = plt.Circle((sensor[1], sensor[0]), CONFIG['radio_cobertura'], 
-                           color=color_sensor, alpha=0.2)
-        ax1.add_patch(circulo_cobertura)
-        
-        # Círculo de área de influencia
-        circulo_influencia = plt.Circle((sensor[1], sensor[0]), CONFIG['radio_influencia'], 
-                                      color=color_sensor, alpha=0.1)
-        ax2.add_patch(circulo_influencia)
+        # La colección solo aporta sus centros a los límites: incluir los
+        # círculos completos, como hacía add_patch
+        ax.update_datalim(np.vstack([centros - radio, centros + radio]))
+        ax.autoscale_view()
     
     # Marcar zonas críticas
-    zonas_criticas = datos[(datos['Salinidad'] > 2.5) | (datos['Humedad'] < 15) | (datos['Humedad'] > 40)]
-    ax1.scatter(zonas_criticas['Longitud'], zonas_criticas['Latitud'],
-               c='black', marker='s', s=60, label='Zonas Criticas', alpha=0.8)
-    ax2.scatter(zonas_criticas['Longitud'], zonas_criticas['Latitud'],
-               c='black', marker='s', s=60, label='Zonas Criticas', alpha=0.8)
+    zonas_criticas = obtener_coordenadas(datos_grafico.loc[identificar_zonas_criticas(datos_grafico)])
+    estilo_criticas = _estilo_scatter(len(zonas_criticas), marker='s', s=60, label='Zonas Criticas', alpha=0.8)
+    ax1.scatter(zonas_criticas[:, 1], zonas_criticas[:, 0], c='black', **estilo_criticas)
+    ax2.scatter(zonas_criticas[:, 1], zonas_criticas[:, 0], c='black', **estilo_criticas)
     
     ax1.set_xlabel('Longitud')
     ax1.set_ylabel('Latitud')
     ax1.set_title(f'{titulo} - Areas de Cobertura')
-    ax1.legend()
+    ax1.legend(handles=ax1.get_legend_handles_labels()[0] + leyenda_sensores)
     ax1.grid(True, alpha=0.3)
     
     ax2.set_xlabel('Longitud')
     ax2.set_ylabel('Latitud')
     ax2.set_title(f'{titulo} - Areas de Influencia')
-    ax2.legend()
+    ax2.legend(handles=ax2.get_legend_handles_labels()[0] + leyenda_sensores)
     ax2.grid(True, alpha=0.3)
     
     plt.tight_layout()
+    controles = (_controles_sensores(fig, [ax1, ax2], marcadores, circulos, sensores_array.copy())
+                 if interactivo else None)
     plt.show()
+    return controles
 
 def visualizar_analisis_eficiencia(sensores, datos):
     """
     Generar análisis completo de eficiencia con múltiples visualizaciones
     
     Args:
-        sensores: Lista de sensores [[lat, lon], ...]
+        sensores: Arreglo (S, 2) de sensores [[lat, lon], ...]
         datos: DataFrame con puntos de muestreo
     """
-    # Calcular métricas detalladas
-    cobertura_total = calcular_cobertura_variabilidad(sensores, datos)
-    balance = balance_entre_cultivos(sensores, datos)
-    zonas_criticas = cubrir_zonas_problematicas(sensores, datos)
-    distribucion = optimizar_distancias(sensores)
+    # Calcular métricas detalladas una sola vez y combinarlas para el total
+    cobertura_total, balance, zonas_criticas, distribucion = _componentes_objetivo(sensores, datos)
+    puntaje_total = combinar_componentes(cobertura_total, balance, zonas_criticas, distribucion)
     
-    # Calcular cobertura por tipo de cultivo
-    cobertura_por_cultivo = {}
-    radio = CONFIG['radio_cobertura']
+    # Calcular cobertura por tipo de cultivo: una sola pasada sobre todos los
+    # puntos, indexada después por cultivo
+    sensores_array = _como_arreglo_sensores(sensores)
+    cubiertos = _puntos_cubiertos(obtener_coordenadas(datos), sensores_array, CONFIG['radio_cobertura'])
     
-    for cultivo in ['Maíz', 'Tomate', 'Chile']:
-        puntos_cultivo = datos[datos['Cultivo'] == cultivo]
-        cubiertos = 0
-        
-        for _, punto in puntos_cultivo.iterrows():
-            punto_coords = [punto['Latitud'], punto['Longitud']]
-            if any(np.sqrt((punto_coords[0]-s[0])**2 + (punto_coords[1]-s[1])**2) <= radio for s in sensores):
-                cubiertos += 1
-        
-        cobertura_por_cultivo[cultivo] = cubiertos / len(puntos_cultivo)
+    cultivo_punto = datos['Cultivo'].to_numpy()
+    cobertura_por_cultivo = {cultivo: cubiertos[cultivo_punto == cultivo].mean() for cultivo in CULTIVOS}
     
     # Crear figura con 4 subgráficos
     fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 10))
@@ -220,16 +630,12 @@ def visualizar_analisis_eficiencia(sensores, datos):
                 f'{valor:.1%}', ha='center', va='bottom')
     
     # Subgráfico 3: Distribución espacial
-    sensores_array = np.array(sensores)
     ax3.scatter(sensores_array[:, 1], sensores_array[:, 0], s=100, c='blue', alpha=0.7)
     
     # Triangulación para mostrar distribución
-    if len(sensores) >= 3:
-        try:
-            tri = Delaunay(sensores_array)
-            ax3.triplot(sensores_array[:, 1], sensores_array[:, 0], tri.simplices, color='red', alpha=0.5)
-        except:
-            pass  # Continuar sin triangulación si falla
+    simplices = _triangulacion_sensores(sensores_array)
+    if simplices is not None:
+        ax3.triplot(sensores_array[:, 1], sensores_array[:, 0], simplices, color='red', alpha=0.5)
     
     ax3.set_xlabel('Longitud')
     ax3.set_ylabel('Latitud')
@@ -238,13 +644,12 @@ def visualizar_analisis_eficiencia(sensores, datos):
     
     # Subgráfico 4: Resumen numérico
     ax4.axis('off')
-    zonas_criticas_total = len(datos[(datos['Salinidad'] > 2.5) | (datos['Humedad'] < 15) | (datos['Humedad'] > 40)])
-    distancias = [np.sqrt((sensores[i][0]-sensores[j][0])**2 + (sensores[i][1]-sensores[j][1])**2) 
-                 for i in range(len(sensores)) for j in range(i+1, len(sensores))]
+    zonas_criticas_total = int(identificar_zonas_criticas(datos).sum())
+    distancias = pdist(sensores_array)
     
     resumen_text = (
         f"RESUMEN DE EFICIENCIA\n\n"
-        f"Puntaje Total: {funcion_objetivo(sensores, datos):.3f}\n"
+        f"Puntaje Total: {puntaje_total:.3f}\n"
         f"Sensores Utilizados: {len(sensores)}\n"
         f"Puntos Cubiertos: {int(cobertura_total * len(datos))}/{len(datos)}\n"
         f"Zonas Criticas Cubiertas: {int(zonas_criticas * zonas_criticas_total)}/{zonas_criticas_total}\n"